@@ -0,0 +1,40 @@
+import argparse
+import time
+from collections import Counter
+
+import url_parser
+from url_parser import aggregate
+from corpus import skewed_host_urls
+
+
+def _time(name, count, run):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f'{name}: {count / elapsed:,.0f} urls/sec')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Counting urls by registrable domain and base url on skewed hosts')
+    parser.add_argument('--count', type=int, default=200000)
+    parser.add_argument('--top', type=int, default=100)
+    args = parser.parse_args()
+
+    urls = skewed_host_urls(args.count)
+    # Load the public suffix list before anything is timed
+    url_parser.get_url(urls[0])
+
+    _time('get_urls + Counter', len(urls), lambda: Counter(
+        f'{url.domain}.{url.top_domain}' for url in url_parser.get_urls(urls)
+    ))
+    _time('count_by_registrable_domain', len(urls), lambda: aggregate.count_by_registrable_domain(urls))
+    _time(f'count_by_registrable_domain (top={args.top})', len(urls), lambda: aggregate.count_by_registrable_domain(
+        urls, top=args.top
+    ))
+    _time('get_base_url + Counter', len(urls), lambda: Counter(map(url_parser.get_base_url, urls)))
+    _time('count_by_base_url', len(urls), lambda: aggregate.count_by_base_url(urls))
+    _time('group_by_base_url', len(urls), lambda: aggregate.group_by_base_url(urls))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from url_parser.public_suffix_list import COMPILED_FILE, compile_public_suffix_list
+
+_SCRIPT = '''
+import time
+start = time.perf_counter()
+import url_parser
+import url_parser.public_suffix_list
+imported = time.perf_counter()
+if {text!r}:
+    url_parser.public_suffix_list.COMPILED_FILE = '/nonexistent'
+url_parser.get_url('https://www.example.co.uk/path?query=1')
+first_call = time.perf_counter()
+print(imported - start, first_call - imported)
+'''
+
+
+def measure_cold_start(text, runs):
+    imports = []
+    first_calls = []
+
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', _SCRIPT.format(text=text)], env=os.environ)
+        imported, first_call = output.split()
+        imports.append(float(imported))
+        first_calls.append(float(first_call))
+
+    return statistics.median(imports), statistics.median(first_calls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import time and first get_url call, with and without the compiled list')
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    if not os.path.exists(COMPILED_FILE):
+        compile_public_suffix_list()
+
+    for name, text in (('text list', True), ('compiled list', False)):
+        imported, first_call = measure_cold_start(text, args.runs)
+        print(f'{name}: import {imported * 1e3:.2f} ms, first get_url {first_call * 1e3:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import time
+
+import url_parser
+from corpus import long_query_urls, mixed_tld_urls
+
+_FIELD_SETS = {
+    'all fields': None,
+    'domain, top_domain': ('domain', 'top_domain'),
+    'protocol, host': ('protocol', 'www', 'sub_domain', 'domain', 'top_domain'),
+    'path, dir, file': ('path', 'dir', 'file'),
+    'query': ('query',),
+}
+
+
+def _best_of(repeat, run):
+    best = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def _report(name, count, elapsed):
+    print(f'{name}: {elapsed / count * 1e6:.2f} us/url ({count / elapsed:,.0f} urls/sec)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per url latency of get_url for different sets of fields')
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for corpus_name, corpus in (('mixed_tld', mixed_tld_urls), ('long_queries', long_query_urls)):
+        urls = corpus(args.count)
+
+        for name, fields in _FIELD_SETS.items():
+            def run_get_url():
+                for url in urls:
+                    url_parser.get_url(url, fields)
+
+            _report(f'{corpus_name}/get_url ({name})', len(urls), _best_of(args.repeat, run_get_url))
+
+        def run_get_registrable_domain():
+            for url in urls:
+                url_parser.get_registrable_domain(url)
+
+        def run_get_base_url():
+            for url in urls:
+                url_parser.get_base_url(url)
+
+        _report(f'{corpus_name}/get_registrable_domain', len(urls), _best_of(args.repeat, run_get_registrable_domain))
+        _report(f'{corpus_name}/get_base_url', len(urls), _best_of(args.repeat, run_get_base_url))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import time
+
+import url_parser
+from url_parser.columns import get_columns
+from url_parser.normalize import normalize_urls
+from corpus import authority_urls, mixed_tld_urls
+
+
+def _best_of(repeat, run):
+    best = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def _report(name, count, elapsed):
+    print(f'{name}: {elapsed / count * 1e6:.2f} us/url ({count / elapsed:,.0f} urls/sec)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per url latency of get_url on a mixed top domain corpus')
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    urls = mixed_tld_urls(args.count)
+    get_url = url_parser.get_url
+    get_base_url = url_parser.get_base_url
+
+    def run_get_url():
+        for url in urls:
+            get_url(url)
+
+    def run_get_base_url():
+        for url in urls:
+            get_base_url(url)
+
+    def run_get_urls():
+        for _ in url_parser.get_urls(urls):
+            pass
+
+    def run_get_base_urls():
+        for _ in url_parser.get_base_urls(urls):
+            pass
+
+    def run_get_columns():
+        get_columns(urls)
+
+    def run_normalize_urls():
+        for _ in normalize_urls(urls):
+            pass
+
+    _report('get_url', len(urls), _best_of(args.repeat, run_get_url))
+    _report('get_urls', len(urls), _best_of(args.repeat, run_get_urls))
+    _report('get_base_url', len(urls), _best_of(args.repeat, run_get_base_url))
+    _report('get_base_urls', len(urls), _best_of(args.repeat, run_get_base_urls))
+    _report('get_columns', len(urls), _best_of(args.repeat, run_get_columns))
+    _report('normalize_urls', len(urls), _best_of(args.repeat, run_normalize_urls))
+
+    authority = authority_urls(args.count)
+
+    def run_get_url_authority():
+        for url in authority:
+            get_url(url)
+
+    _report('get_url (ports, user info and IP hosts)', len(authority), _best_of(args.repeat, run_get_url_authority))
+
+    url_parser.enable_host_cache(maxsize=len(urls))
+    _report('get_url (host cache)', len(urls), _best_of(args.repeat, run_get_url))
+    url_parser.disable_host_cache()
+
+    url_parser.enable_stats()
+    _report('get_url (stats)', len(urls), _best_of(args.repeat, run_get_url))
+    url_parser.disable_stats()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import gc
+import tracemalloc
+
+import url_parser
+from corpus import mixed_tld_urls, skewed_host_urls
+
+_HOST_FIELDS = ('protocol', 'www', 'sub_domain', 'domain', 'top_domain')
+
+
+def _held_bytes(parse, urls, setup=None):
+    gc.collect()
+    tracemalloc.start()
+
+    # Anything setup makes, like the intern table, is counted against the urls
+    if setup is not None:
+        setup()
+
+    results = [parse(url) for url in urls]
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return held
+
+
+def _get_host(url):
+    return url_parser.get_url(url, fields=_HOST_FIELDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory held per parsed url')
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    for corpus_name, corpus in (('mixed_tld', mixed_tld_urls), ('skewed_hosts', skewed_host_urls)):
+        urls = corpus(args.count)
+
+        # Fill the top domain cache first, it is shared and not held per url
+        for url in urls:
+            url_parser.get_registrable_domain(url)
+
+        for name, parse in (
+            ('get_url', url_parser.get_url),
+            ('get_url host fields', _get_host),
+            ('get_compact_url', url_parser.get_compact_url),
+        ):
+            held = _held_bytes(parse, urls)
+            interned = _held_bytes(parse, urls, url_parser.enable_interning)
+            url_parser.disable_interning()
+            print(
+                f'{corpus_name}/{name}: {held / len(urls):.0f} bytes/url, '
+                f'{interned / len(urls):.0f} bytes/url interned ({interned / held - 1:+.0%})'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+import argparse
+import time
+
+import url_parser
+from corpus import mixed_tld_urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of get_urls across worker processes')
+    parser.add_argument('--count', type=int, default=200000)
+    parser.add_argument('--chunksize', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    urls = mixed_tld_urls(args.count)
+    baseline = None
+
+    for workers in args.workers:
+        start = time.perf_counter()
+
+        for _ in url_parser.get_urls(urls, workers=workers, chunksize=args.chunksize):
+            pass
+
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f'workers={workers}: {len(urls) / elapsed:,.0f} urls/sec, {baseline / elapsed:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import sys
+import threading
+import time
+
+import url_parser
+from corpus import mixed_tld_urls
+
+
+def _parse_in_threads(urls, threads):
+    barrier = threading.Barrier(threads + 1)
+    shares = [urls[index::threads] for index in range(threads)]
+
+    def parse(share):
+        barrier.wait()
+
+        for url in share:
+            url_parser.get_url(url)
+
+    workers = [threading.Thread(target=parse, args=(share,)) for share in shares]
+
+    for worker in workers:
+        worker.start()
+
+    barrier.wait()
+    start = time.perf_counter()
+
+    for worker in workers:
+        worker.join()
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of get_url shared by several threads')
+    parser.add_argument('--count', type=int, default=200000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--host-cache', action='store_true', help='parse with the host cache enabled')
+    args = parser.parse_args()
+
+    urls = mixed_tld_urls(args.count)
+
+    if args.host_cache:
+        url_parser.enable_host_cache()
+
+    # Load the public suffix list before anything is timed
+    url_parser.get_url(urls[0])
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'Python {sys.version.split()[0]}, GIL {"enabled" if gil else "disabled"}')
+    baseline = None
+
+    for threads in args.threads:
+        elapsed = _parse_in_threads(urls, threads)
+        baseline = baseline or elapsed
+        print(f'threads={threads}: {len(urls) / elapsed:,.0f} urls/sec, {baseline / elapsed:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
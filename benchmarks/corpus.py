@@ -0,0 +1,137 @@
+import itertools
+import random
+
+from url_parser.public_suffix_list import PublicSuffixList
+
+_WORDS = [
+    'shop', 'news', 'mail', 'cdn', 'static', 'blog', 'api', 'media', 'img',
+    'app', 'login', 'search', 'video', 'docs', 'help', 'store', 'forum',
+]
+
+_MULTI_LABEL_TOP_DOMAINS = [
+    'co.uk', 'org.uk', 'com.au', 'co.jp', 'com.br', 'co.nz', 'gov.uk', 'ac.uk', 'com.cn', 'co.za',
+    'github.io', 'blogspot.com', 'herokuapp.com', 'appspot.com', 'cloudfront.net', 's3.amazonaws.com',
+]
+
+
+def _label(rng):
+    return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz0123456789-') for _ in range(rng.randint(3, 12))).strip('-') or 'x'
+
+
+def _top_domains():
+    return [rule for rule in PublicSuffixList.get_list() if rule[0] not in '*!']
+
+
+def _query(rng, parameters):
+    return '?' + '&'.join(f'{rng.choice(_WORDS)}={_label(rng)}' for _ in range(parameters))
+
+
+def _url(rng, host):
+    url = rng.choice(('http://', 'https://', '')) + host
+
+    if rng.random() < 0.8:
+        url += '/' + '/'.join(rng.choice(_WORDS) for _ in range(rng.randint(0, 4)))
+
+        if rng.random() < 0.5:
+            url += rng.choice(('index.html', 'style.css', 'app.js', 'image.png'))
+
+    if rng.random() < 0.5:
+        url += _query(rng, rng.randint(1, 6))
+
+    if rng.random() < 0.1:
+        url += '#' + rng.choice(_WORDS)
+
+    return url
+
+
+def _host(rng, top_domain, sub_domains):
+    host = _label(rng) + '.' + top_domain
+
+    for _ in range(sub_domains):
+        host = rng.choice(_WORDS) + '.' + host
+
+    if rng.random() < 0.3:
+        host = 'www.' + host
+
+    return host
+
+
+def mixed_tld_urls(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    top_domains = _top_domains()
+    return [_url(rng, _host(rng, rng.choice(top_domains), rng.choice((0, 0, 1, 1, 2, 3)))) for _ in range(count)]
+
+
+def skewed_host_urls(count: int, seed: int = 0, hosts: int = 5000) -> list:
+    # Host popularity follows a Zipf like curve, so a few hosts make up most
+    # of the urls like in real traffic
+    rng = random.Random(seed)
+    top_domains = ['com'] * 20 + ['net', 'org', 'de', 'co.uk', 'no', 'io'] + _top_domains()[:200]
+    host_names = [_host(rng, rng.choice(top_domains), rng.choice((0, 1, 1, 2))) for _ in range(hosts)]
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, hosts + 1)))
+    return [_url(rng, host) for host in rng.choices(host_names, cum_weights=weights, k=count)]
+
+
+def deep_subdomain_urls(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [_url(rng, _host(rng, rng.choice(('com', 'co.uk', 'net')), rng.randint(4, 12))) for _ in range(count)]
+
+
+def long_query_urls(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        f'https://{_host(rng, "com", 1)}/track/click{_query(rng, rng.randint(30, 80))}'
+        for _ in range(count)
+    ]
+
+
+def multi_label_suffix_urls(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [_url(rng, _host(rng, rng.choice(_MULTI_LABEL_TOP_DOMAINS), rng.choice((0, 1, 2)))) for _ in range(count)]
+
+
+def authority_urls(count: int, seed: int = 0) -> list:
+    # Hosts as seen in ingress logs: user info, ports and IPv4 and IPv6
+    # addresses next to ordinary domains
+    rng = random.Random(seed)
+    domains = ('example.com', 'example.co.uk', 'example.net')
+    shapes = [
+        lambda: _host(rng, rng.choice(domains), 0),
+        lambda: _host(rng, rng.choice(domains), 0) + f':{rng.randint(1, 65535)}',
+        lambda: f'{rng.choice(_WORDS)}:{_label(rng)}@' + _host(rng, rng.choice(domains), 0),
+        lambda: '.'.join(str(rng.randint(0, 255)) for _ in range(4)) + rng.choice(('', ':8080', ':443')),
+        lambda: '[2001:db8::' + format(rng.randint(0, 0xffff), 'x') + ']' + rng.choice(('', ':8080')),
+    ]
+    return [_url(rng, rng.choice(shapes)()) for _ in range(count)]
+
+
+def pathological_urls(count: int, seed: int = 0) -> list:
+    # Valid but hostile inputs: very long labels, many labels, long runs of
+    # delimiters and repeated separators in the path, query and fragment
+    rng = random.Random(seed)
+    shapes = [
+        lambda size: 'http://' + 'a' * size + '.com/',
+        lambda size: 'http://' + 'a.' * size + 'example.com/',
+        lambda size: 'http://' + '-' * size + 'x.example.com/',
+        lambda size: 'http://example.com/' + '/' * size,
+        lambda size: 'http://example.com/' + 'a/' * size + 'file.js',
+        lambda size: 'http://example.com/?' + '&' * size,
+        lambda size: 'http://example.com/?' + '=' * size,
+        lambda size: 'http://example.com/?' + '?' * size,
+        lambda size: 'http://example.com/#' + '#' * size,
+        lambda size: 'http://example.com/' + '#?' * size,
+        lambda size: 'a' * size + '://example.com/',
+        lambda size: 'http://www.' + 'www.' * size + 'example.com',
+    ]
+    return [rng.choice(shapes)(rng.randint(100, 5000)) for _ in range(count)]
+
+
+CORPORA = {
+    'mixed_tld': mixed_tld_urls,
+    'skewed_hosts': skewed_host_urls,
+    'deep_subdomains': deep_subdomain_urls,
+    'long_queries': long_query_urls,
+    'multi_label_suffixes': multi_label_suffix_urls,
+    'pathological': pathological_urls,
+    'authority': authority_urls,
+}
@@ -0,0 +1,154 @@
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import url_parser
+from bench_cold_start import measure_cold_start
+from corpus import CORPORA
+
+_FUNCTIONS = {
+    'get_url': url_parser.get_url,
+    'get_base_url': url_parser.get_base_url,
+    'get_compact_url': url_parser.get_compact_url,
+}
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def _measure(function, urls, repeat):
+    timer = time.perf_counter_ns
+    latencies = []
+    best = None
+
+    for _ in range(repeat):
+        run = []
+        start = timer()
+
+        for url in urls:
+            call_start = timer()
+            function(url)
+            run.append(timer() - call_start)
+
+        elapsed = timer() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+            latencies = run
+
+    latencies.sort()
+    gc.collect()
+    tracemalloc.start()
+    results = [function(url) for url in urls]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+
+    return {
+        'ops_per_sec': len(urls) / (best / 1e9),
+        'p50_us': _percentile(latencies, 0.5) / 1e3,
+        'p99_us': _percentile(latencies, 0.99) / 1e3,
+        'peak_bytes_per_url': peak / len(urls),
+    }
+
+
+def run(count, repeat, corpora, functions, cold_start_runs):
+    results = {}
+
+    for corpus_name in corpora:
+        urls = CORPORA[corpus_name](count)
+
+        for function_name in functions:
+            result = _measure(_FUNCTIONS[function_name], urls, repeat)
+            results[f'{function_name}/{corpus_name}'] = result
+            print(
+                f'{function_name}/{corpus_name}: {result["ops_per_sec"]:,.0f} ops/sec, '
+                f'p50 {result["p50_us"]:.2f} us, p99 {result["p99_us"]:.2f} us, '
+                f'peak {result["peak_bytes_per_url"]:.0f} bytes/url'
+            )
+
+        url_parser.enable_host_cache(maxsize=10000)
+        result = _measure(url_parser.get_url, urls, repeat)
+        url_parser.disable_host_cache()
+        results[f'get_url_host_cache/{corpus_name}'] = result
+        print(f'get_url_host_cache/{corpus_name}: {result["ops_per_sec"]:,.0f} ops/sec, p99 {result["p99_us"]:.2f} us')
+
+    if cold_start_runs:
+        for name, text in (('text', True), ('compiled', False)):
+            imported, first_call = measure_cold_start(text, cold_start_runs)
+            results[f'cold_start/{name}'] = {'import_ms': imported * 1e3, 'first_call_ms': first_call * 1e3}
+            print(f'cold_start/{name}: import {imported * 1e3:.2f} ms, first get_url {first_call * 1e3:.2f} ms')
+
+    return results
+
+
+# Higher is better for these, lower is better for everything else
+_HIGHER_IS_BETTER = {'ops_per_sec'}
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            expected = baseline.get(name, {}).get(metric)
+
+            if not expected:
+                continue
+
+            change = value / expected - 1
+
+            if metric in _HIGHER_IS_BETTER:
+                change = -change
+
+            if change > threshold:
+                regressions.append(f'{name} {metric}: {expected:,.2f} -> {value:,.2f} ({change:+.0%} worse)')
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite for url_parser with baselines and regression checks')
+    parser.add_argument('--count', type=int, default=20000, help='urls per corpus')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark, the fastest one is kept')
+    parser.add_argument('--corpora', nargs='+', choices=sorted(CORPORA), default=list(CORPORA))
+    parser.add_argument('--functions', nargs='+', choices=sorted(_FUNCTIONS), default=list(_FUNCTIONS))
+    parser.add_argument('--cold-start-runs', type=int, default=10, help='fresh processes for cold start, 0 to skip')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare with a JSON baseline and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=0.15, help='relative change that counts as a regression')
+    args = parser.parse_args()
+
+    results = run(args.count, args.repeat, args.corpora, args.functions, args.cold_start_runs)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as file:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'count': args.count,
+                'results': results,
+            }, file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+
+        regressions = compare(results, baseline['results'], args.threshold)
+
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+
+        if regressions:
+            sys.exit(1)
+
+        print(f'No regressions over {args.threshold:.0%} against {args.compare}')
+
+
+if __name__ == '__main__':
+    main()
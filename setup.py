@@ -1,8 +1,25 @@
+import os
+
 from setuptools import setup
+from setuptools.command.build_py import build_py
 
 with open("README.md", "r") as fh:
     long_description = fh.read()
 
+
+class BuildPyWithCompiledSuffixList(build_py):
+    def run(self):
+        super().run()
+
+        from url_parser.public_suffix_list import compile_public_suffix_list
+
+        package_dir = os.path.join(self.build_lib, 'url_parser')
+        compile_public_suffix_list(
+            os.path.join(package_dir, 'public_suffix_list.dat'),
+            os.path.join(package_dir, 'public_suffix_list.bin'),
+        )
+
+
 setup(name='url_parser',
       version='3.0.3',
       description='Parse url and get all the different parts out of it',
@@ -23,13 +40,11 @@ setup(name='url_parser',
           'Topic :: Software Development :: Libraries :: Python Modules',
           'Development Status :: 5 - Production/Stable',
           'Programming Language :: Python',
-          'Programming Language :: Python :: 2',
-          'Programming Language :: Python :: 2.7',
           'Programming Language :: Python :: 3',
-          'Programming Language :: Python :: 3.4',
-          'Programming Language :: Python :: 3.5',
-          'Programming Language :: Python :: 3.6',
+          'Programming Language :: Python :: 3 :: Only',
           'Programming Language :: Python :: 3.7',
       ],
+      python_requires='>=3.7',
+      cmdclass={'build_py': BuildPyWithCompiledSuffixList},
       zip_safe=False
       )
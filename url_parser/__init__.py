@@ -1,8 +1,18 @@
+import contextlib
 import re
+import time
 import warnings
 from collections import namedtuple
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Union
 
+from url_parser.host_cache import CacheInfo, HostCache
+from url_parser.hosts import get_ip_version, normalize_host, split_authority, to_ascii, to_unicode
+from url_parser.interning import InternTable
 from url_parser.public_suffix_list import PublicSuffixList
+from url_parser.query import QueryView
+from url_parser.stats import HOST_STAGE, PATH_STAGE, QUERY_STAGE, Stats, StatsCollector
+
+IdnaDomain = namedtuple('IdnaDomain', ['unicode', 'ascii'])
 
 UrlObject = namedtuple(
     'UrlObject', [
@@ -15,15 +25,222 @@ UrlObject = namedtuple(
         'dir',
         'file',
         'fragment',
-        'query'
-    ])
+        'query',
+        'port',
+        'userinfo',
+        'host_type',
+    ],
+    # Added after the others, so urls built from the first ten still work
+    defaults=(None, None, None),
+)
+
+class CompactUrl:
+    # Only keeps the url, the shared host split and where each part starts
+    # and ends. Parts are sliced out of the url when they are read, and the
+    # query is a QueryView over the url, made the first time it is read.
+    __slots__ = (
+        '_url', '_host', '_protocol_end', '_path_start', '_path_end',
+        '_query_start', '_query_end', '_fragment_start', '_fragment_end', '_query',
+    )
+
+    def __init__(self, url: str, host: tuple, match):
+        self._url = url
+        self._host = host
+        self._protocol_end = match.end('protocol')
+        self._path_start, self._path_end = match.span('path')
+        self._query_start, self._query_end = match.span('query')
+        self._fragment_start, self._fragment_end = match.span('fragment')
+
+        if self._fragment_start >= self._fragment_end:
+            self._fragment_start, self._fragment_end = match.span('last_fragment')
+
+        self._query = None
+
+    def _slice(self, start, end):
+        return self._url[start:end] if start < end else None
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    @property
+    def protocol(self):
+        return self._slice(0, self._protocol_end)
+
+    @property
+    def www(self):
+        return self._host[0]
+
+    @property
+    def sub_domain(self):
+        return self._host[1]
+
+    @property
+    def domain(self):
+        return self._host[2]
+
+    @property
+    def top_domain(self):
+        return self._host[3]
+
+    def _authority(self):
+        # The host starts after "://" when there is a protocol
+        start = self._protocol_end + 3 if self._protocol_end > 0 else 0
+        authority = self._url[start:self._path_start]
+
+        if '@' in authority or ':' in authority:
+            return split_authority(authority)
+
+        return None, authority, None
+
+    @property
+    def port(self):
+        return self._authority()[2]
+
+    @property
+    def userinfo(self):
+        return self._authority()[0]
+
+    @property
+    def host_type(self):
+        return _get_host_type(self._host[2], self._host[3])
+
+    @property
+    def path(self):
+        return self._slice(self._path_start, self._path_end)
+
+    @property
+    def dir(self):
+        path = self.path
+        return _split_path(path)[0] if path is not None else None
+
+    @property
+    def file(self):
+        path = self.path
+        return _split_path(path)[1] if path is not None else None
+
+    @property
+    def fragment(self):
+        return self._slice(self._fragment_start, self._fragment_end)
+
+    @property
+    def query(self):
+        if self._query is None and self._query_start < self._query_end:
+            self._query = QueryView(self._url, self._query_start, self._query_end)
+
+        return self._query
+
+    def to_url_object(self) -> 'UrlObject':
+        query = self._url[self._query_start:self._query_end]
+        query = _split_query(query) if query else None
+        return UrlObject(**{
+            field: query if field == 'query' else getattr(self, field) for field in UrlObject._fields
+        })
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactUrl):
+            return NotImplemented
+
+        return self._url == other._url
+
+    def __hash__(self):
+        return hash(self._url)
+
+    def __repr__(self):
+        return f'CompactUrl({self._url!r})'
+
+
+_host_cache = None
+
+
+def enable_host_cache(maxsize: int = 10000):
+    global _host_cache
+    _host_cache = HostCache(maxsize)
+
+
+def disable_host_cache():
+    global _host_cache
+    _host_cache = None
+
+
+def cache_info() -> CacheInfo:
+    cache = _host_cache
+
+    if cache is None:
+        return CacheInfo(0, 0, 0, 0, 0)
+
+    return cache.info()
+
+
+def cache_clear():
+    cache = _host_cache
+
+    if cache is not None:
+        cache.clear()
+
+
+_intern_table = None
+
+# Protocols are few, so they are always interned
+_protocols = InternTable(1024)
+
+
+def enable_interning(maxsize: int = 100000):
+    global _intern_table
+    _intern_table = InternTable(maxsize)
+
+
+def disable_interning():
+    global _intern_table
+    _intern_table = None
+
+
+_stats = None
+
+
+def enable_stats(slow_urls: int = 10):
+    global _stats
+    _stats = StatsCollector(slow_urls)
+
+
+def disable_stats():
+    global _stats
+    _stats = None
+
+
+def get_stats() -> Stats:
+    stats = _stats
+
+    if stats is None:
+        return StatsCollector(0).snapshot()
+
+    return stats.snapshot()
+
+
+def clear_stats():
+    stats = _stats
+
+    if stats is not None:
+        stats.clear()
+
+
+@contextlib.contextmanager
+def collect_stats(slow_urls: int = 10):
+    global _stats
+    previous = _stats
+    stats = _stats = StatsCollector(slow_urls)
+
+    try:
+        yield stats
+    finally:
+        _stats = previous
 
 
 def _split_query_group(query_groups: list) -> dict:
     result = dict()
 
     for query_group in query_groups:
-        query = query_group.split('=')
+        query = query_group.split('=', 1)
 
         if len(query) == 1:
             result[query[0]] = None
@@ -34,105 +251,371 @@ def _split_query_group(query_groups: list) -> dict:
     return result
 
 
-def _parse_url_with_top_domain(url, top_domain):
-    regex = r"^(?:(?P<protocol>[\w\d]+)(?:\:\/\/))?" \
-                  r"(?P<sub_domain>" \
-                  r"(?P<www>(?:www)?)(?:\.?)" \
-                  r"(?:(?:[\w\d-]+|\.)*?)?" \
-                  r")(?:\.?)" \
-                  r"(?P<domain>[^./]+(?=\.))\." \
-                  r"(?P<top_domain>" + re.escape(top_domain) + r"(?![^/?#]))" \
-                  r"(?P<path>" \
-                  r"(?P<dir>\/(?:[^/\r\n]+(?:/))+)?" \
-                  r"(?:\/?)(?P<file>[^?#\r\n]+)?" \
-                  r")?" \
-                  r"(?:\#(?P<fragment>[^#?\r\n]*))?" \
-                  r"(?:\?(?P<query>.*(?=$)))*$"
-
-    dict_data = {
-        'protocol': None,
-        'www': None,
-        'sub_domain': None,
-        'domain': None,
-        'top_domain': None,
-        'path': None,
-        'dir': None,
-        'file': None,
-        'fragment': None,
-        'query': None,
-    }
-
-    match = re.search(regex, url)
-
-    dict_data['protocol'] = match.group('protocol') if match.group('protocol') else None
-    dict_data['www'] = match.group('www') if match.group('www') else None
-    dict_data['sub_domain'] = match.group('sub_domain') if match.group('sub_domain') else None
-    dict_data['domain'] = match.group('domain')
-    dict_data['top_domain'] = top_domain
-    dict_data['path'] = match.group('path') if match.group('path') else None
-    dict_data['dir'] = match.group('dir') if match.group('dir') else None
-    dict_data['file'] = match.group('file') if match.group('file') else None
-    dict_data['fragment'] = match.group('fragment') if match.group('fragment') else None
-
-    query = match.group('query') if match.group('query') else None
-
-    if query is not None:
-        query_groups = query.split('&')
-        query = _split_query_group(query_groups)
-        dict_data['query'] = query
-
-    return dict_data
-
-
-def _parse_url_with_public_suffix(url):
-    public_suffix = PublicSuffixList.get_list()
-    public_suffix.sort()
-
-    domain_regex = r"(?:^|\/)(?P<domain>[^:/#?]+)(?:[/#?]|$)"
-    match = re.search(domain_regex, url)
-    domain = match.group('domain')
-    domain_parts = domain.split('.')
-
-    top_domain = None
-
-    for i in range(len(domain_parts)):
-        tail_gram = domain_parts[i:len(domain_parts)]
-        tail_gram = '.'.join(tail_gram)
-
-        if tail_gram in public_suffix:
-            top_domain = tail_gram
-            break
-
-    data = _parse_url_with_top_domain(url, top_domain)
-
-    return data
-
-
-def get_base_url(url: str) -> str:
-    url = get_url(url)
-    protocol = str(url.protocol) + '://' if url.protocol is not None else 'http://'
-    www = 'www.' if url.www is not None else ''
-    sub_domain = str(url.sub_domain) + '.' if url.sub_domain is not None and url.sub_domain != 'www.' else ''
-    return protocol + www + sub_domain + url.domain + '.' + url.top_domain
-
-
-def get_url(url: str) -> UrlObject:
-    data = _parse_url_with_public_suffix(url)
-
-    object_data = UrlObject(
-        protocol=data['protocol'],
-        www=data['www'],
-        sub_domain=data['sub_domain'],
-        domain=data['domain'],
-        top_domain=data['top_domain'],
-        path=data['path'],
-        dir=data['dir'],
-        file=data['file'],
-        fragment=data['fragment'],
-        query=data['query'],
+# Splits a url into its parts in a single pass. Every group is optional and
+# only stops at the delimiter that starts the next one, so the pattern
+# matches any string without backtracking into earlier groups. The only
+# backtracking left is the protocol giving back word characters when there is
+# no "://", which happens once, so matching is linear in the url length. Keep
+# it that way: the url is often attacker controlled, and TestLinearTime checks
+# it. The fragment is accepted both before and after the query.
+_URL_REGEX = re.compile(
+    r"^(?:(?P<protocol>[\w\d]+)(?:\:\/\/))?"
+    r"(?P<host>[^/?#]*)"
+    r"(?P<path>[^?#]*)"
+    r"(?:\#(?P<fragment>[^?#]*))?"
+    r"(?:\?(?P<query>[^#]*))?"
+    r"(?:\#(?P<last_fragment>.*))?$",
+    re.DOTALL
+)
+
+# The start of _URL_REGEX, for when only the protocol and host are needed and
+# the rest of the url does not have to be read
+_HOST_REGEX = re.compile(r"^(?:(?P<protocol>[\w\d]+)(?:\:\/\/))?(?P<host>[^/?#]*)")
+
+_HOST_FIELDS = frozenset(('www', 'sub_domain', 'domain', 'top_domain', 'host_type'))
+_AUTHORITY_FIELDS = frozenset(('port', 'userinfo'))
+_HOST_REGEX_FIELDS = _HOST_FIELDS | _AUTHORITY_FIELDS | {'protocol'}
+_PATH_FIELDS = frozenset(('path', 'dir', 'file'))
+
+
+def _split_host(host, include_private=None):
+    host = normalize_host(host)
+
+    # An IP address has no top domain to look up, it is kept whole as domain
+    if get_ip_version(host) is not None:
+        return None, None, host, None
+
+    top_domain = PublicSuffixList.find_top_domain(host.split('.'), include_private, _stats)
+    sub_domain, _, domain = host[:-len(top_domain) - 1].rpartition('.')
+
+    if not domain:
+        raise ValueError(f'Could not find a domain in host: {host!r}')
+
+    www = None
+
+    if sub_domain[0:3] == 'www' and sub_domain[3:4] in ('', '.'):
+        www = 'www'
+
+        # A lone www has always been returned with its dot as sub domain
+        if sub_domain == 'www':
+            sub_domain = 'www.'
+
+    table = _intern_table
+
+    if table is not None:
+        domain = table.intern(domain)
+        sub_domain = table.intern(sub_domain) if sub_domain else None
+
+    return www, sub_domain or None, domain, top_domain
+
+
+def _get_hostname(authority):
+    # The parsers that need the user info or port split the authority
+    # themselves and pass the hostname on, so it is only ever split once
+    if '@' in authority or ':' in authority:
+        return split_authority(authority)[1]
+
+    return authority
+
+
+def _find_host(host, include_private=None):
+    cache = _host_cache
+
+    # The host cache only holds splits made with the global setting
+    if cache is None or include_private is not None and include_private != PublicSuffixList.get_include_private():
+        return _split_host(host, include_private)
+
+    return cache.lookup(host, _split_host, PublicSuffixList.get_version())
+
+
+# Every parser goes through the helpers below for the regex match, the host
+# lookup and splitting the path and query, so they are the ones that report
+# to the stats collector when it is enabled. Disabled, each costs one check.
+
+def _match(regex, url):
+    stats = _stats
+
+    if stats is None:
+        return regex.match(url)
+
+    start = time.perf_counter_ns()
+    match = regex.match(url)
+    stats.start_url(url, time.perf_counter_ns() - start)
+    return match
+
+
+def _timed(stats, stage, function, *args):
+    start = time.perf_counter_ns()
+
+    try:
+        return function(*args)
+    finally:
+        stats.record_stage(stage, time.perf_counter_ns() - start)
+
+
+def _lookup_host(host, include_private=None):
+    stats = _stats
+
+    if stats is None:
+        return _find_host(host, include_private)
+
+    try:
+        return _timed(stats, HOST_STAGE, _find_host, host, include_private)
+    except ValueError:
+        stats.record_error()
+        raise
+
+
+def _get_host_type(domain, top_domain):
+    if top_domain is not None:
+        return 'domain'
+
+    return 'ipv6' if domain[:1] == '[' else 'ipv4'
+
+
+def _split_path_parts(path):
+    index = path.rfind('/')
+
+    # The leading slash on its own is not a directory
+    directory = path[:index + 1] if index > 0 else None
+    file = path[index + 1:] or None
+
+    return directory, file
+
+
+def _split_path(path):
+    stats = _stats
+
+    if stats is None:
+        return _split_path_parts(path)
+
+    return _timed(stats, PATH_STAGE, _split_path_parts, path)
+
+
+def _split_query(query):
+    stats = _stats
+
+    if stats is None:
+        return _split_query_group(query.split('&'))
+
+    return _timed(stats, QUERY_STAGE, _split_query_group, query.split('&'))
+
+
+def _parse_url(url, include_private=None):
+    match = _match(_URL_REGEX, url)
+    host = match.group('host')
+    userinfo = port = None
+
+    if '@' in host or ':' in host:
+        userinfo, host, port = split_authority(host)
+
+    www, sub_domain, domain, top_domain = _lookup_host(host, include_private)
+    path = match.group('path') or None
+    directory, file = _split_path(path) if path is not None else (None, None)
+    query = match.group('query')
+    protocol = match.group('protocol')
+
+    return UrlObject(
+        _protocols.intern(protocol) if protocol else None,
+        www,
+        sub_domain,
+        domain,
+        top_domain,
+        path,
+        directory,
+        file,
+        match.group('fragment') or match.group('last_fragment') or None,
+        _split_query(query) if query else None,
+        port,
+        userinfo,
+        _get_host_type(domain, top_domain),
+    )
+
+
+def _get_fields(fields) -> frozenset:
+    fields = frozenset(fields)
+    unknown_fields = fields.difference(UrlObject._fields)
+
+    if unknown_fields:
+        raise ValueError(f'Unknown fields: {", ".join(sorted(unknown_fields))}')
+
+    return fields
+
+
+def _parse_url_fields(url, fields, include_private=None):
+    match = _match(_HOST_REGEX if fields <= _HOST_REGEX_FIELDS else _URL_REGEX, url)
+    protocol = www = sub_domain = domain = top_domain = path = directory = file = fragment = query = None
+    host = match.group('host')
+    userinfo = port = host_type = None
+
+    if 'protocol' in fields:
+        protocol = match.group('protocol')
+        protocol = _protocols.intern(protocol) if protocol else None
+
+    if '@' in host or ':' in host:
+        userinfo, host, port = split_authority(host)
+
+    if fields & _HOST_FIELDS:
+        www, sub_domain, domain, top_domain = _lookup_host(host, include_private)
+        host_type = _get_host_type(domain, top_domain)
+
+    if fields & _PATH_FIELDS:
+        path = match.group('path') or None
+
+        if path is not None and ('dir' in fields or 'file' in fields):
+            directory, file = _split_path(path)
+
+    if 'fragment' in fields:
+        fragment = match.group('fragment') or match.group('last_fragment') or None
+
+    if 'query' in fields:
+        query = match.group('query')
+        query = _split_query(query) if query else None
+
+    return UrlObject(
+        protocol,
+        www if 'www' in fields else None,
+        sub_domain if 'sub_domain' in fields else None,
+        domain if 'domain' in fields else None,
+        top_domain if 'top_domain' in fields else None,
+        path if 'path' in fields else None,
+        directory if 'dir' in fields else None,
+        file if 'file' in fields else None,
+        fragment,
+        query,
+        port if 'port' in fields else None,
+        userinfo if 'userinfo' in fields else None,
+        host_type if 'host_type' in fields else None,
     )
 
-    return object_data
+
+def _build_base_url(match, include_private=None):
+    host = match.group('host')
+    port = None
+
+    if '@' in host or ':' in host:
+        _, host, port = split_authority(host)
+
+    _, sub_domain, domain, top_domain = _lookup_host(host, include_private)
+    protocol = match.group('protocol') or 'http'
+    port = ':' + port if port is not None else ''
+
+    if top_domain is None:
+        return f'{protocol}://{domain}{port}'
+
+    if sub_domain is None:
+        return f'{protocol}://{domain}.{top_domain}{port}'
+
+    # The sub domain already starts with any www, a lone one with its dot
+    if sub_domain == 'www.':
+        return f'{protocol}://www.{domain}.{top_domain}{port}'
+
+    return f'{protocol}://{sub_domain}.{domain}.{top_domain}{port}'
+
+
+def get_base_url(url: str, include_private: bool = None) -> str:
+    return _build_base_url(_match(_HOST_REGEX, url), include_private)
+
+
+def _get_base_urls(urls, include_private=None):
+    match_url = _match
+    build_base_url = _build_base_url
+
+    for url in urls:
+        yield build_base_url(match_url(_HOST_REGEX, url), include_private)
+
+
+def get_base_urls(urls: Iterable[str], workers: int = 1, chunksize: int = 1000,
+                  include_private: bool = None) -> Iterator[str]:
+    if workers > 1:
+        # Worker processes do not necessarily share the global setting
+        if include_private is None:
+            include_private = PublicSuffixList.get_include_private()
+
+        from url_parser.parallel import get_base_urls_in_pool
+        return get_base_urls_in_pool(urls, workers, chunksize, include_private)
+
+    return _get_base_urls(urls, include_private)
+
+
+def get_registrable_domain(url: str, include_private: bool = None) -> str:
+    _, _, domain, top_domain = _lookup_host(_get_hostname(_match(_HOST_REGEX, url).group('host')), include_private)
+    return domain + '.' + top_domain if top_domain is not None else domain
+
+
+def get_idna_domain(url: str, include_private: bool = None) -> IdnaDomain:
+    domain = get_registrable_domain(url, include_private)
+    return IdnaDomain(to_unicode(domain), to_ascii(domain))
+
+
+def get_url(url: str, fields: Iterable[str] = None, include_private: bool = None) -> UrlObject:
+    if fields is None:
+        return _parse_url(url, include_private)
+
+    return _parse_url_fields(url, _get_fields(fields), include_private)
+
+
+def _get_urls(urls, fields=None, include_private=None):
+    if fields is not None:
+        for url in urls:
+            yield _parse_url_fields(url, fields, include_private)
+
+        return
+
+    parse = _parse_url
+
+    for url in urls:
+        yield parse(url, include_private)
+
+
+def get_urls(urls: Iterable[str], workers: int = 1, chunksize: int = 1000,
+             fields: Iterable[str] = None, include_private: bool = None) -> Iterator[UrlObject]:
+    if fields is not None:
+        fields = _get_fields(fields)
+
+    if workers > 1:
+        # Worker processes do not necessarily share the global setting
+        if include_private is None:
+            include_private = PublicSuffixList.get_include_private()
+
+        from url_parser.parallel import get_urls_in_pool
+        return get_urls_in_pool(urls, workers, chunksize, fields, include_private)
+
+    return _get_urls(urls, fields, include_private)
+
+
+def aget_urls(urls: Union[Iterable[str], AsyncIterable[str]], chunksize: int = 1000, executor=None,
+              concurrency: int = 2, fields: Iterable[str] = None,
+              include_private: bool = None) -> AsyncIterator[UrlObject]:
+    from url_parser.aio import aget_urls
+    return aget_urls(urls, chunksize, executor, concurrency, fields, include_private)
+
+
+def aget_base_urls(urls: Union[Iterable[str], AsyncIterable[str]], chunksize: int = 1000, executor=None,
+                   concurrency: int = 2, include_private: bool = None) -> AsyncIterator[str]:
+    from url_parser.aio import aget_base_urls
+    return aget_base_urls(urls, chunksize, executor, concurrency, include_private)
+
+
+def get_compact_url(url: str, include_private: bool = None) -> CompactUrl:
+    match = _match(_URL_REGEX, url)
+    return CompactUrl(url, _lookup_host(_get_hostname(match.group('host')), include_private), match)
+
+
+def get_compact_urls(urls: Iterable[str], include_private: bool = None) -> Iterator[CompactUrl]:
+    match_url = _match
+    get_hostname = _get_hostname
+    lookup_host = _lookup_host
+    compact_url = CompactUrl
+
+    for url in urls:
+        match = match_url(_URL_REGEX, url)
+        yield compact_url(url, lookup_host(get_hostname(match.group('host')), include_private), match)
+
+
+def get_query(url: str):
+    start, end = _match(_URL_REGEX, url).span('query')
+    return QueryView(url, start, end) if start < end else None
 
 
 def parse_url(url: str) -> dict:
@@ -0,0 +1,3 @@
+from url_parser.cli import main
+
+main()
@@ -0,0 +1,218 @@
+import functools
+import itertools
+from collections import Counter
+from typing import Iterable, Union
+
+from url_parser import _HOST_REGEX, _build_base_url, _get_hostname, _lookup_host, _match
+from url_parser.public_suffix_list import PublicSuffixList
+
+# Keys are remembered by the host or protocol and host they came from, so a
+# repeated host is looked up once and all its urls share one key string
+_MEMO_SIZE = 65536
+
+
+class TopK:
+    # Misra-Gries heavy hitters: keeps at most k keys, and a key's count is
+    # at most max_error below its true count. Every key seen more than
+    # total / (k + 1) times is kept. Results of separate streams can be merged.
+    __slots__ = ('k', 'total', 'max_error', '_counts')
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError('k must be at least 1')
+
+        self.k = k
+        self.total = 0
+        self.max_error = 0
+        self._counts = {}
+
+    def _decrement(self, amount):
+        self._counts = {key: count - amount for key, count in self._counts.items() if count > amount}
+        self.max_error += amount
+
+    def add(self, key: str, count: int = 1):
+        counts = self._counts
+        self.total += count
+
+        if key in counts:
+            counts[key] += count
+            return
+
+        if len(counts) >= self.k:
+            decrement = min(count, min(counts.values()))
+            self._decrement(decrement)
+            count -= decrement
+
+            if not count:
+                return
+
+        self._counts[key] = count
+
+    def update(self, keys: Iterable[str]):
+        for key in keys:
+            counts = self._counts
+
+            if key in counts:
+                counts[key] += 1
+                self.total += 1
+            else:
+                self.add(key)
+
+    def merge(self, other: Union['TopK', Counter]) -> 'TopK':
+        counts = self._counts
+
+        if isinstance(other, TopK):
+            items = other._counts.items()
+            self.total += other.total
+            self.max_error += other.max_error
+        else:
+            items = other.items()
+            self.total += sum(other.values())
+
+        for key, count in items:
+            counts[key] = counts.get(key, 0) + count
+
+        if len(counts) > self.k:
+            self._decrement(sorted(counts.values(), reverse=True)[self.k])
+
+        return self
+
+    def most_common(self, n: int = None) -> list:
+        return Counter(self._counts).most_common(n)
+
+    def __getitem__(self, key):
+        return self._counts.get(key, 0)
+
+    def __contains__(self, key):
+        return key in self._counts
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __repr__(self):
+        return f'TopK(k={self.k}, total={self.total}, max_error={self.max_error})'
+
+
+def _registrable_domains(urls, include_private=None):
+    match_url = _match
+    get_hostname = _get_hostname
+    lookup_host = _lookup_host
+    domains = {}
+
+    for url in urls:
+        host = match_url(_HOST_REGEX, url).group('host')
+        domain = domains.get(host)
+
+        if domain is None:
+            _, _, domain, top_domain = lookup_host(get_hostname(host), include_private)
+            if top_domain is not None:
+                domain = domain + '.' + top_domain
+
+            if len(domains) >= _MEMO_SIZE:
+                domains.clear()
+
+            domains[host] = domain
+
+        yield domain
+
+
+def _base_urls(urls, include_private=None):
+    match_url = _match
+    base_urls = {}
+
+    for url in urls:
+        match = match_url(_HOST_REGEX, url)
+        prefix = match.group()
+        base_url = base_urls.get(prefix)
+
+        if base_url is None:
+            base_url = _build_base_url(match, include_private)
+
+            if len(base_urls) >= _MEMO_SIZE:
+                base_urls.clear()
+
+            base_urls[prefix] = base_url
+
+        yield base_url
+
+
+def _count(keys, top):
+    if top is None:
+        return Counter(keys)
+
+    heavy_hitters = TopK(top)
+    heavy_hitters.update(keys)
+    return heavy_hitters
+
+
+def _count_chunk(urls, get_keys, top):
+    # The pool yields from what each chunk returns, so the partial result is
+    # wrapped in a list
+    return [_count(get_keys(urls), top)]
+
+
+def _count_urls(get_keys, urls, top, workers, chunksize, include_private):
+    if workers > 1:
+        from url_parser.parallel import _map_chunks
+        # Worker processes do not necessarily share the global setting
+        if include_private is None:
+            include_private = PublicSuffixList.get_include_private()
+
+        get_keys = functools.partial(get_keys, include_private=include_private)
+        function = functools.partial(_count_chunk, get_keys=get_keys, top=top)
+        return merge_counts(_map_chunks(function, urls, workers, chunksize), top)
+
+    return _count(get_keys(urls, include_private), top)
+
+
+def merge_counts(results: Iterable[Union[Counter, TopK]], top: int = None) -> Union[Counter, TopK]:
+    if top is None:
+        merged = Counter()
+
+        for result in results:
+            if isinstance(result, TopK):
+                raise ValueError('Heavy hitters can only be merged with top')
+
+            merged.update(result)
+
+        return merged
+
+    merged = TopK(top)
+
+    for result in results:
+        merged.merge(result)
+
+    return merged
+
+
+def count_by_registrable_domain(urls: Iterable[str], top: int = None, workers: int = 1,
+                                chunksize: int = 10000, include_private: bool = None) -> Union[Counter, TopK]:
+    return _count_urls(_registrable_domains, urls, top, workers, chunksize, include_private)
+
+
+def count_by_base_url(urls: Iterable[str], top: int = None, workers: int = 1,
+                      chunksize: int = 10000, include_private: bool = None) -> Union[Counter, TopK]:
+    return _count_urls(_base_urls, urls, top, workers, chunksize, include_private)
+
+
+def _group_urls(get_keys, urls, include_private):
+    urls, keyed_urls = itertools.tee(urls)
+    groups = {}
+
+    for url, key in zip(urls, get_keys(keyed_urls, include_private)):
+        group = groups.get(key)
+
+        if group is None:
+            group = groups[key] = []
+
+        group.append(url)
+
+    return groups
+
+
+def group_by_registrable_domain(urls: Iterable[str], include_private: bool = None) -> dict:
+    return _group_urls(_registrable_domains, urls, include_private)
+
+
+def group_by_base_url(urls: Iterable[str], include_private: bool = None) -> dict:
+    return _group_urls(_base_urls, urls, include_private)
@@ -0,0 +1,96 @@
+import asyncio
+import functools
+import itertools
+from collections import deque
+
+import url_parser
+from url_parser import parallel
+from url_parser.public_suffix_list import PublicSuffixList
+
+
+async def _chunks(urls, chunksize):
+    if hasattr(urls, '__aiter__'):
+        chunk = []
+
+        async for url in urls:
+            chunk.append(url)
+
+            if len(chunk) >= chunksize:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+        return
+
+    iterator = iter(urls)
+    chunk = list(itertools.islice(iterator, chunksize))
+
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(iterator, chunksize))
+
+
+def _with_public_suffix_list(urls, function, loaded_rules):
+    # The executor is not ours to give an initializer, so a loaded list is
+    # handed over with every chunk. In this process it is already in use.
+    if loaded_rules is not None and PublicSuffixList._loaded_rules != loaded_rules:
+        PublicSuffixList._load_rules(*loaded_rules)
+
+    return function(urls)
+
+
+def _bind(function, **keywords):
+    function = functools.partial(function, **keywords)
+    return functools.partial(_with_public_suffix_list, function=function, loaded_rules=PublicSuffixList._loaded_rules)
+
+
+async def _map_chunks(function, urls, chunksize, executor, concurrency):
+    if chunksize < 1 or concurrency < 1:
+        raise ValueError('chunksize and concurrency must be at least 1')
+
+    if executor is None:
+        async for chunk in _chunks(urls, chunksize):
+            for result in function(chunk):
+                yield result
+
+            # Give other tasks a turn between chunks, a chunk is the longest
+            # the loop is ever blocked for
+            await asyncio.sleep(0)
+
+        return
+
+    loop = asyncio.get_running_loop()
+    pending = deque()
+
+    async for chunk in _chunks(urls, chunksize):
+        if len(pending) >= concurrency:
+            for result in await pending.popleft():
+                yield result
+
+        pending.append(loop.run_in_executor(executor, function, chunk))
+
+    while pending:
+        for result in await pending.popleft():
+            yield result
+
+
+def aget_urls(urls, chunksize=1000, executor=None, concurrency=2, fields=None, include_private=None):
+    if fields is not None:
+        fields = url_parser._get_fields(fields)
+
+    # An executor's workers do not necessarily share the global setting
+    if include_private is None:
+        include_private = PublicSuffixList.get_include_private()
+
+    function = _bind(parallel._get_urls, fields=fields, include_private=include_private)
+    return _map_chunks(function, urls, chunksize, executor, concurrency)
+
+
+def aget_base_urls(urls, chunksize=1000, executor=None, concurrency=2, include_private=None):
+    if include_private is None:
+        include_private = PublicSuffixList.get_include_private()
+
+    function = _bind(parallel._get_base_urls, include_private=include_private)
+    return _map_chunks(function, urls, chunksize, executor, concurrency)
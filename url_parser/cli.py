@@ -0,0 +1,158 @@
+import argparse
+import csv
+import functools
+import io
+import json
+import os
+import sys
+import time
+
+from url_parser import _HOST_FIELDS, _URL_REGEX, _get_hostname, _lookup_host, _match
+from url_parser.columns import FIELDS, _GETTERS
+from url_parser.parallel import _chunks, _map_chunks
+
+_BUFFER_SIZE = 1 << 20
+
+# Values are written with the escapes TSV readers like PostgreSQL's COPY
+# understand, so a tab or line break in a url can not shift the columns
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _read_lines(paths):
+    # Lines are read as bytes and decoded one at a time when parsed, so a
+    # line that is not valid utf-8 is reported instead of parsed with
+    # replacement characters
+    for path in paths:
+        if path == '-':
+            file = io.open(sys.stdin.fileno(), 'rb', buffering=_BUFFER_SIZE, closefd=False)
+            name = '<stdin>'
+        else:
+            file = open(path, 'rb', buffering=_BUFFER_SIZE)
+            name = path
+
+        with file:
+            for number, line in enumerate(file, 1):
+                line = line.strip()
+
+                if line:
+                    yield name, number, line
+
+
+def _parse_lines(lines, fields):
+    getters = [_GETTERS[field] for field in fields]
+    # Like get_url with fields, the host is only looked up when a part of it
+    # is asked for
+    lookup_host = _lookup_host if _HOST_FIELDS.intersection(fields) else None
+    match_url = _match
+    host = None
+    results = []
+
+    for name, number, line in lines:
+        try:
+            # UnicodeDecodeError is a ValueError, so it is reported the same way
+            match = match_url(_URL_REGEX, line.decode('utf-8'))
+
+            if lookup_host is not None:
+                host = lookup_host(_get_hostname(match.group('host')))
+        except ValueError as error:
+            results.append((name, number, None, str(error)))
+            continue
+
+        results.append((name, number, [get(match, host) for get in getters], None))
+
+    return results
+
+
+def _write_tsv(output, fields, rows):
+    output.write('\t'.join(fields) + '\n')
+
+    for values in rows:
+        output.write('\t'.join('' if value is None else value.translate(_TSV_ESCAPES) for value in values) + '\n')
+
+
+def _write_csv(output, fields, rows):
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(fields)
+    writer.writerows(rows)
+
+
+def _write_jsonl(output, fields, rows):
+    for values in rows:
+        output.write(json.dumps(dict(zip(fields, values)), ensure_ascii=False) + '\n')
+
+
+_WRITERS = {
+    'tsv': _write_tsv,
+    'csv': _write_csv,
+    'jsonl': _write_jsonl,
+}
+
+
+def _parse_arguments(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m url_parser',
+        description='Parse urls, one per line, and write the selected parts of each url.',
+    )
+    parser.add_argument('files', nargs='*', default=['-'], help='files to read urls from, - or nothing for stdin')
+    parser.add_argument('--fields', default=','.join(FIELDS),
+                        help=f'comma separated parts to write, out of: {",".join(FIELDS)}')
+    parser.add_argument('--format', choices=sorted(_WRITERS), default='tsv')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes to parse with')
+    parser.add_argument('--chunksize', type=int, default=10000, help='urls per chunk sent to a worker')
+    parser.add_argument('--stats', action='store_true', help='write a summary with urls/sec to stderr')
+    arguments = parser.parse_args(argv)
+
+    arguments.fields = [field.strip() for field in arguments.fields.split(',') if field.strip()]
+    unknown_fields = [field for field in arguments.fields if field not in _GETTERS]
+
+    if unknown_fields:
+        parser.error(f'unknown fields: {", ".join(unknown_fields)}')
+
+    if arguments.workers < 1 or arguments.chunksize < 1:
+        parser.error('--workers and --chunksize must be at least 1')
+
+    return arguments
+
+
+def main(argv=None):
+    arguments = _parse_arguments(argv)
+    parse_lines = functools.partial(_parse_lines, fields=arguments.fields)
+    lines = _read_lines(arguments.files)
+
+    if arguments.workers > 1:
+        results = _map_chunks(parse_lines, lines, arguments.workers, arguments.chunksize)
+    else:
+        results = (result for chunk in _chunks(lines, arguments.chunksize) for result in parse_lines(chunk))
+
+    counts = {'parsed': 0, 'malformed': 0}
+
+    def rows():
+        for name, number, values, error in results:
+            if error is not None:
+                counts['malformed'] += 1
+                print(f'{name}:{number}: {error}', file=sys.stderr)
+                continue
+
+            counts['parsed'] += 1
+            yield values
+
+    start = time.perf_counter()
+
+    try:
+        _WRITERS[arguments.format](sys.stdout, arguments.fields, rows())
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader stopped early, as with | head. Stdout is pointed at
+        # devnull so flushing it on exit does not raise again.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+
+    if arguments.stats:
+        total = counts['parsed'] + counts['malformed']
+        print(
+            f'{total} urls, {counts["parsed"]} parsed, {counts["malformed"]} malformed '
+            f'in {elapsed:.3f} s ({total / elapsed if elapsed else 0:,.0f} urls/sec)',
+            file=sys.stderr,
+        )
@@ -0,0 +1,229 @@
+from array import array
+from typing import Iterable
+
+from url_parser import (
+    UrlObject, _HOST_FIELDS, _URL_REGEX, _get_host_type, _get_hostname, _lookup_host, _match, _split_path,
+)
+from url_parser.hosts import split_authority
+
+# The query is kept as the raw query string, since a mapping per row does not
+# fit in a column
+FIELDS = UrlObject._fields
+
+DICTIONARY_FIELDS = ('protocol', 'www', 'top_domain', 'host_type')
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('pyarrow is needed to convert url columns to arrow, install it with: pip install pyarrow')
+
+    return pyarrow
+
+
+class _Validity:
+    # One bit per row, set when the row has a value, laid out like an arrow
+    # validity bitmap
+    __slots__ = ('bitmap', 'null_count', '_length')
+
+    def __init__(self):
+        self.bitmap = bytearray()
+        self.null_count = 0
+        self._length = 0
+
+    def append(self, valid: bool):
+        bit = self._length & 7
+
+        if bit == 0:
+            self.bitmap.append(0)
+
+        if valid:
+            self.bitmap[-1] |= 1 << bit
+        else:
+            self.null_count += 1
+
+        self._length += 1
+
+
+class StringColumn:
+    # Utf-8 values back to back in data, with offsets[i]:offsets[i + 1] being
+    # row i, the same layout as an arrow large_string array
+    __slots__ = ('data', 'offsets', 'validity')
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('q', [0])
+        self.validity = _Validity()
+
+    def append(self, value):
+        if value is not None:
+            self.data += value.encode('utf-8')
+
+        self.offsets.append(len(self.data))
+        self.validity.append(value is not None)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int):
+        length = len(self)
+
+        if index < 0:
+            index += length
+
+        if not 0 <= index < length:
+            raise IndexError('column index out of range')
+
+        if not self.validity.bitmap[index >> 3] & (1 << (index & 7)):
+            return None
+
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+    def to_list(self) -> list:
+        return [self[index] for index in range(len(self))]
+
+    def to_arrow(self):
+        pyarrow = _import_pyarrow()
+        buffers = [pyarrow.py_buffer(self.validity.bitmap), pyarrow.py_buffer(self.offsets), pyarrow.py_buffer(self.data)]
+        return pyarrow.Array.from_buffers(pyarrow.large_string(), len(self), buffers, self.validity.null_count)
+
+
+class DictionaryColumn:
+    # Every distinct value is stored once in values, and codes holds the index
+    # of each row's value, or -1 for rows without a value
+    __slots__ = ('codes', 'values', '_codes_by_value')
+
+    def __init__(self):
+        self.codes = array('i')
+        self.values = []
+        self._codes_by_value = {}
+
+    def append(self, value):
+        if value is None:
+            self.codes.append(-1)
+            return
+
+        code = self._codes_by_value.get(value)
+
+        if code is None:
+            code = len(self.values)
+            self._codes_by_value[value] = code
+            self.values.append(value)
+
+        self.codes.append(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index: int):
+        code = self.codes[index]
+        return self.values[code] if code >= 0 else None
+
+    def to_list(self) -> list:
+        values = self.values
+        return [values[code] if code >= 0 else None for code in self.codes]
+
+    def to_arrow(self):
+        pyarrow = _import_pyarrow()
+        validity = _Validity()
+
+        for code in self.codes:
+            validity.append(code >= 0)
+
+        buffers = [pyarrow.py_buffer(validity.bitmap), pyarrow.py_buffer(self.codes)]
+        indices = pyarrow.Array.from_buffers(pyarrow.int32(), len(self), buffers, validity.null_count)
+        return pyarrow.DictionaryArray.from_arrays(indices, pyarrow.array(self.values, pyarrow.string()))
+
+
+class UrlColumns:
+    def __init__(self, columns: dict):
+        self.columns = columns
+
+    def __len__(self):
+        for column in self.columns.values():
+            return len(column)
+
+        return 0
+
+    def __getitem__(self, field: str):
+        return self.columns[field]
+
+    def to_dict(self) -> dict:
+        return {field: column.to_list() for field, column in self.columns.items()}
+
+    def to_arrow(self):
+        pyarrow = _import_pyarrow()
+        fields = list(self.columns)
+        return pyarrow.table([self.columns[field].to_arrow() for field in fields], names=fields)
+
+    def to_pandas(self):
+        return self.to_arrow().to_pandas()
+
+
+def _path(match, host):
+    return match.group('path') or None
+
+
+def _dir(match, host):
+    path = match.group('path')
+    return _split_path(path)[0] if path else None
+
+
+def _file(match, host):
+    path = match.group('path')
+    return _split_path(path)[1] if path else None
+
+
+def _authority(match):
+    authority = match.group('host')
+
+    if '@' in authority or ':' in authority:
+        return split_authority(authority)
+
+    return None, authority, None
+
+
+_GETTERS = {
+    'protocol': lambda match, host: match.group('protocol'),
+    'www': lambda match, host: host[0],
+    'sub_domain': lambda match, host: host[1],
+    'domain': lambda match, host: host[2],
+    'top_domain': lambda match, host: host[3],
+    'path': _path,
+    'dir': _dir,
+    'file': _file,
+    'fragment': lambda match, host: match.group('fragment') or match.group('last_fragment') or None,
+    'query': lambda match, host: match.group('query') or None,
+    'port': lambda match, host: _authority(match)[2],
+    'userinfo': lambda match, host: _authority(match)[0],
+    'host_type': lambda match, host: _get_host_type(host[2], host[3]),
+}
+
+
+def get_columns(urls: Iterable[str], fields: Iterable[str] = FIELDS,
+                dictionary_fields: Iterable[str] = DICTIONARY_FIELDS, include_private: bool = None) -> UrlColumns:
+    fields = tuple(fields)
+    dictionary_fields = set(dictionary_fields)
+    unknown_fields = set(fields).difference(_GETTERS)
+
+    if unknown_fields:
+        raise ValueError(f'Unknown fields: {", ".join(sorted(unknown_fields))}')
+
+    columns = {field: DictionaryColumn() if field in dictionary_fields else StringColumn() for field in fields}
+    appenders = [(columns[field].append, _GETTERS[field]) for field in fields]
+    match_url = _match
+    # The host is only looked up when a part of it is asked for
+    lookup_host = _lookup_host if _HOST_FIELDS.intersection(fields) else None
+    host = None
+
+    for url in urls:
+        match = match_url(_URL_REGEX, url)
+
+        if lookup_host is not None:
+            host = lookup_host(_get_hostname(match.group('host')), include_private)
+
+        for append, get in appenders:
+            append(get(match, host))
+
+    return UrlColumns(columns)
@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+# Longer hosts are not valid domain names, so they are resolved without being
+# cached rather than letting junk input take up the cache
+_MAX_HOST_LENGTH = 253
+
+
+class HostCache:
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._version = 0
+
+    def lookup(self, host: str, resolve, version: int = 0):
+        with self._lock:
+            if version > self._version:
+                # Every cached split was made with an older public suffix list
+                self._data.clear()
+                self._version = version
+            elif version < self._version:
+                return resolve(host)
+
+            value = self._data.get(host)
+
+            if value is not None:
+                self._data.move_to_end(host)
+                self._hits += 1
+                return value
+
+            self._misses += 1
+
+        value = resolve(host)
+
+        if len(host) > _MAX_HOST_LENGTH:
+            return value
+
+        with self._lock:
+            # The public suffix list was swapped while resolving
+            if version != self._version:
+                return value
+
+            self._data[host] = value
+
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+        return value
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self.maxsize, len(self._data))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
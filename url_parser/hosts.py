@@ -0,0 +1,119 @@
+import ipaddress
+import re
+from encodings import idna
+
+_CACHE_SIZE = 65536
+
+_ACE_PREFIX = 'xn--'
+
+_IPV4_REGEX = re.compile(r'(?:(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)\.){3}(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)', re.ASCII)
+
+_ascii_hosts = {}
+_unicode_hosts = {}
+_ipv6_hosts = {}
+
+
+def split_authority(authority: str) -> tuple:
+    # Splits user:password@host:port into its user info, host and port, any
+    # of which but the host can be None. An IPv6 host keeps its brackets, and
+    # an empty port is dropped along with its colon.
+    userinfo, _, host = authority.rpartition('@')
+    port = None
+
+    if host[-1:] != ']':
+        hostname, colon, digits = host.rpartition(':')
+
+        if colon and (digits == '' or digits.isdigit() and digits.isascii()):
+            host, port = hostname, digits or None
+
+    return userinfo if '@' in authority else None, host, port
+
+
+def get_ip_version(host: str):
+    # No top domain ends with a digit and no domain starts with a bracket, so
+    # almost every host is ruled out by its first or last character
+    if host[:1] == '[':
+        if host[-1:] != ']':
+            return None
+
+        # Checking the address with ipaddress is slow, so every host is only
+        # checked once until the cache fills up
+        version = _ipv6_hosts.get(host, 0)
+
+        if version == 0:
+            try:
+                # A zone id is percent encoded in urls, as %25
+                ipaddress.IPv6Address(host[1:-1].replace('%25', '%', 1))
+                version = 6
+            except ValueError:
+                version = None
+
+            if len(_ipv6_hosts) >= _CACHE_SIZE:
+                _ipv6_hosts.clear()
+
+            _ipv6_hosts[host] = version
+
+        return version
+
+    if host[-1:].isdigit() and _IPV4_REGEX.fullmatch(host):
+        return 4
+
+    return None
+
+
+def normalize_host(host: str) -> str:
+    # Hosts are case insensitive and may end with the dot of the root zone
+    if host[-1:] == '.':
+        host = host[:-1]
+
+    return host.lower()
+
+
+def _to_ascii_label(label):
+    if label.isascii():
+        return label
+
+    try:
+        return idna.ToASCII(label).decode('ascii')
+    except UnicodeError:
+        return label
+
+
+def _to_unicode_label(label):
+    if not label.startswith(_ACE_PREFIX):
+        return label
+
+    try:
+        return idna.ToUnicode(label)
+    except UnicodeError:
+        return label
+
+
+def _convert(host, cache, convert_label):
+    # The codecs are pure Python and slow, so every host is only converted
+    # once until the cache fills up
+    converted = cache.get(host)
+
+    if converted is None:
+        converted = '.'.join(convert_label(label) for label in host.split('.'))
+
+        if len(cache) >= _CACHE_SIZE:
+            cache.clear()
+
+        cache[host] = converted
+
+    return converted
+
+
+def to_ascii(host: str) -> str:
+    if host.isascii():
+        return host
+
+    return _convert(host, _ascii_hosts, _to_ascii_label)
+
+
+def to_unicode(host: str) -> str:
+    if _ACE_PREFIX not in host:
+        return host
+
+    return _convert(host, _unicode_hosts, _to_unicode_label)
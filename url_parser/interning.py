@@ -0,0 +1,30 @@
+class InternTable:
+    # Hands out one shared object for equal strings. Once full it starts
+    # over, so input that never repeats cannot grow it without bound.
+    __slots__ = ('maxsize', '_strings')
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+
+        self.maxsize = maxsize
+        self._strings = {}
+
+    def intern(self, string):
+        strings = self._strings
+        interned = strings.get(string)
+
+        if interned is not None:
+            return interned
+
+        if len(strings) >= self.maxsize:
+            strings.clear()
+
+        strings[string] = string
+        return string
+
+    def __len__(self):
+        return len(self._strings)
+
+    def clear(self):
+        self._strings.clear()
@@ -0,0 +1,151 @@
+from typing import Iterable, Iterator, Union
+
+from url_parser import CompactUrl, UrlObject, _URL_REGEX, _match
+from url_parser.hosts import get_ip_version, normalize_host, split_authority, to_ascii
+from url_parser.query import _decode
+
+DEFAULT_PORTS = {
+    'http': '80',
+    'https': '443',
+    'ws': '80',
+    'wss': '443',
+    'ftp': '21',
+}
+
+
+def _normalize_query(query, sort_query, drop_query_params):
+    if not drop_query_params and '&' not in query:
+        return query
+
+    parameters = [parameter for parameter in query.split('&') if parameter]
+
+    if drop_query_params:
+        # Keys are matched decoded, so utm%5Fsource is dropped with utm_source
+        parameters = [
+            parameter for parameter in parameters
+            if _decode(parameter.partition('=')[0]) not in drop_query_params
+        ]
+
+    if sort_query:
+        # Sorting is stable, so repeated keys keep their order
+        parameters.sort(key=lambda parameter: parameter.partition('=')[0])
+
+    return '&'.join(parameters)
+
+
+def _normalize(url, default_protocol, remove_default_port, ascii_host, sort_query, drop_query_params,
+               remove_fragment):
+    match = _match(_URL_REGEX, url)
+    protocol = (match.group('protocol') or default_protocol).lower()
+    userinfo, host, port = split_authority(match.group('host'))
+    host = normalize_host(host)
+
+    if not host:
+        raise ValueError(f'Could not find a host in url: {url!r}')
+
+    if ascii_host:
+        host = to_ascii(host)
+
+    if port is not None:
+        port = port.lstrip('0') or '0'
+
+        if remove_default_port and DEFAULT_PORTS.get(protocol) == port:
+            port = None
+
+    parts = [protocol, '://']
+
+    if userinfo is not None:
+        parts += (userinfo, '@')
+
+    parts.append(host)
+
+    if port is not None:
+        parts += (':', port)
+
+    parts.append(match.group('path') or '/')
+    query = match.group('query')
+
+    if query:
+        query = _normalize_query(query, sort_query, drop_query_params)
+
+        if query:
+            parts += ('?', query)
+
+    if not remove_fragment:
+        fragment = match.group('fragment') or match.group('last_fragment')
+
+        if fragment:
+            parts += ('#', fragment)
+
+    return ''.join(parts)
+
+
+def normalize_url(url: str, default_protocol: str = 'http', remove_default_port: bool = True,
+                  ascii_host: bool = True, sort_query: bool = True, drop_query_params: Iterable[str] = (),
+                  remove_fragment: bool = True) -> str:
+    return _normalize(
+        url, default_protocol, remove_default_port, ascii_host, sort_query, frozenset(drop_query_params),
+        remove_fragment,
+    )
+
+
+def normalize_urls(urls: Iterable[str], default_protocol: str = 'http', remove_default_port: bool = True,
+                   ascii_host: bool = True, sort_query: bool = True, drop_query_params: Iterable[str] = (),
+                   remove_fragment: bool = True) -> Iterator[str]:
+    normalize = _normalize
+    drop_query_params = frozenset(drop_query_params)
+
+    for url in urls:
+        yield normalize(
+            url, default_protocol, remove_default_port, ascii_host, sort_query, drop_query_params, remove_fragment,
+        )
+
+
+def rebuild_url(url: Union[UrlObject, CompactUrl]) -> str:
+    # Only an IP address is kept whole as the domain, any other host needs its
+    # top domain too. get_url with fields leaves out the parts not asked for.
+    if url.domain is None or url.top_domain is None and get_ip_version(url.domain) is None:
+        raise ValueError(f'Can not rebuild a url without its domain and top domain: {url!r}')
+
+    parts = []
+
+    if url.protocol:
+        parts += (url.protocol, '://')
+
+    if url.userinfo is not None:
+        parts += (url.userinfo, '@')
+
+    # A lone www sub domain is kept with its dot
+    if url.sub_domain == 'www.':
+        parts.append('www.')
+    elif url.sub_domain:
+        parts += (url.sub_domain, '.')
+
+    parts.append(url.domain)
+
+    # An IP address is kept whole as the domain
+    if url.top_domain is not None:
+        parts += ('.', url.top_domain)
+
+    if url.port is not None:
+        parts += (':', url.port)
+
+    if url.path:
+        parts.append(url.path)
+
+    query = url.query
+
+    if query:
+        # The query dict of a UrlObject only keeps the last value of a repeated
+        # key, a CompactUrl keeps the raw query
+        if isinstance(query, dict):
+            query = '&'.join(key if value is None else f'{key}={value}' for key, value in query.items())
+        else:
+            query = query.raw
+
+        parts += ('?', query)
+
+    if url.fragment:
+        parts += ('#', url.fragment)
+
+    return ''.join(parts)
@@ -0,0 +1,66 @@
+import functools
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import url_parser
+from url_parser.public_suffix_list import PublicSuffixList
+
+
+def _load_public_suffix_list(loaded_rules, include_private):
+    # Spawned workers start from the bundled list and the default setting,
+    # so they are handed the parent's. Forked ones already have them.
+    if loaded_rules is not None and PublicSuffixList._loaded_rules != loaded_rules:
+        PublicSuffixList._load_rules(*loaded_rules)
+
+    PublicSuffixList.set_include_private(include_private)
+    PublicSuffixList.get_trie()
+
+
+def _get_urls(urls, fields=None, include_private=None):
+    return list(url_parser._get_urls(urls, fields, include_private))
+
+
+def _get_base_urls(urls, include_private=None):
+    return list(url_parser._get_base_urls(urls, include_private))
+
+
+def _chunks(urls, chunksize):
+    iterator = iter(urls)
+    chunk = list(itertools.islice(iterator, chunksize))
+
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(iterator, chunksize))
+
+
+def _map_chunks(function, urls, workers, chunksize, mp_context=None):
+    if workers < 1 or chunksize < 1:
+        raise ValueError('workers and chunksize must be at least 1')
+
+    initargs = (PublicSuffixList._loaded_rules, PublicSuffixList.get_include_private())
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=_load_public_suffix_list,
+                             initargs=initargs) as executor:
+        pending = deque()
+
+        for chunk in _chunks(urls, chunksize):
+            # Only keep two chunks per worker in flight, so input is not read
+            # faster than the results are consumed
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+
+            pending.append(executor.submit(function, chunk))
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def get_urls_in_pool(urls, workers, chunksize, fields=None, include_private=None, mp_context=None):
+    function = functools.partial(_get_urls, fields=fields, include_private=include_private)
+    return _map_chunks(function, urls, workers, chunksize, mp_context)
+
+
+def get_base_urls_in_pool(urls, workers, chunksize, include_private=None, mp_context=None):
+    function = functools.partial(_get_base_urls, include_private=include_private)
+    return _map_chunks(function, urls, workers, chunksize, mp_context)
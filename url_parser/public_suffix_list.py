@@ -1,34 +1,401 @@
+import marshal
+import mmap
 import os
+import struct
+import threading
+import zlib
+
+from url_parser.hosts import to_ascii
+from url_parser.interning import InternTable
+
+# Trie nodes keep the kind of rule that ends at them under this key. Labels
+# are always strings, so it can never collide with a child label.
+_TERMINAL = None
+
+_RULE = 1
+_EXCEPTION = 2
+# Set on top of the kind for rules from the private domains section
+_PRIVATE = 4
+
+_PRIVATE_SECTION = '// ===BEGIN PRIVATE DOMAINS==='
+
+_WILDCARD = '*'
+
+_CACHE_SIZE = 65536
+
+# The compiled list starts with a magic and the length of a marshalled header
+# holding the size and checksum of the .dat file it was built from, the
+# longest rule under every top level label and the offset of its subtree.
+# Subtrees follow as separate marshalled blobs, so only the ones needed are
+# loaded.
+_COMPILED_MAGIC = b'PSL\x04'
+_COMPILED_PREFIX = struct.Struct('<4sI')
+
+_DIR_PATH = os.path.dirname(os.path.realpath(__file__))
+DAT_FILE = f'{_DIR_PATH}/public_suffix_list.dat'
+COMPILED_FILE = f'{_DIR_PATH}/public_suffix_list.bin'
+
+
+def _read_sections(text: str) -> tuple:
+    # Lists without section markers are read as all ICANN rules
+    rules = []
+    icann_rules = None
+
+    for line in text.splitlines():
+        line = line.strip()
+
+        if line == _PRIVATE_SECTION:
+            icann_rules = rules
+            rules = []
+            continue
+
+        if line == '' or line[0:2] == '//':
+            continue
+
+        rules.append(line)
+
+    if icann_rules is None:
+        return tuple(rules), ()
+
+    return tuple(icann_rules), tuple(rules)
+
+
+def _build_trie(icann_rules, private_rules=()):
+    trie = {}
+
+    for section, rules in ((0, icann_rules), (_PRIVATE, private_rules)):
+        for rule in rules:
+            kind = _RULE
+
+            if rule[0] == '!':
+                kind = _EXCEPTION
+                rule = rule[1:]
+
+            # The list spells internationalized rules in Unicode, hosts can come
+            # in either form, so those rules are added in their ASCII form as well
+            for form in {rule, to_ascii(rule)}:
+                labels = form.split('.')
+                node = trie
+
+                for label in reversed(labels):
+                    node = node.setdefault(label, {})
+
+                # A rule in both sections stays an ICANN rule
+                node.setdefault(_TERMINAL, kind | section)
+
+    return trie
+
+
+def _get_depth(node):
+    return 1 + max((_get_depth(child) for label, child in node.items() if label is not _TERMINAL), default=0)
+
+
+def _get_depths(trie):
+    # The longest rule under each top level label. A top level wildcard
+    # applies under every label, so its rules count for all of them.
+    depths = {label: _get_depth(node) for label, node in trie.items()}
+    wildcard_depth = depths.get(_WILDCARD, 1)
+    return {label: max(depth, wildcard_depth) for label, depth in depths.items()}
+
+
+def _match_top_domains(trie: dict, domain_parts: list) -> tuple:
+    # Finds the top domain by the ICANN rules and by all rules in one walk,
+    # private rules are only skipped when they match
+    nodes = [trie]
+    lengths = [1, 1]  # The default rule "*" makes the last label a top domain
+    exceptions = [0, 0]
+
+    for depth in range(1, len(domain_parts) + 1):
+        label = domain_parts[-depth]
+        matches = []
+
+        for node in nodes:
+            child = node.get(label)
+            wildcard = node.get(_WILDCARD)
+
+            if child is not None:
+                matches.append(child)
+
+            if wildcard is not None and wildcard is not child:
+                matches.append(wildcard)
+
+        if not matches:
+            break
+
+        for node in matches:
+            kind = node.get(_TERMINAL)
+
+            if kind is None:
+                continue
+
+            found = exceptions if kind & _EXCEPTION else lengths
+            found[1] = depth
+
+            if not kind & _PRIVATE:
+                found[0] = depth
+
+        nodes = matches
+
+    top_domains = []
+
+    for length, exception in zip(lengths, exceptions):
+        # An exception rule always wins, and its top domain is the rule
+        # without its leftmost label
+        if exception:
+            length = exception - 1
+
+        top_domains.append('.'.join(domain_parts[-length:]))
+
+    if top_domains[0] == top_domains[1]:
+        return top_domains[0], top_domains[0]
+
+    return tuple(top_domains)
+
+
+def compile_public_suffix_list(dat_file: str = DAT_FILE, compiled_file: str = COMPILED_FILE):
+    with open(dat_file, 'rb') as file:
+        data = file.read()
+
+    trie = _build_trie(*_read_sections(data.decode('utf-8')))
+    depths = _get_depths(trie)
+    subtrees = []
+    offsets = {}
+    offset = 0
+
+    for label, node in trie.items():
+        subtree = marshal.dumps(node)
+        offsets[label] = (offset, len(subtree))
+        offset += len(subtree)
+        subtrees.append(subtree)
+
+    header = marshal.dumps((len(data), zlib.crc32(data), depths, offsets))
+    temporary_file = f'{compiled_file}.tmp'
+
+    with open(temporary_file, 'wb') as file:
+        file.write(_COMPILED_PREFIX.pack(_COMPILED_MAGIC, len(header)))
+        file.write(header)
+
+        for subtree in subtrees:
+            file.write(subtree)
+
+    os.replace(temporary_file, compiled_file)
+
+
+class _SuffixTrie:
+    def __init__(self, trie: dict, depths: dict, pending: dict = None, compiled=None, offset: int = 0):
+        self.trie = trie
+        self._depths = depths
+        # Labels without rules of their own only have the top level wildcard
+        # or the default rule
+        self._default_depth = depths.get(_WILDCARD, 1)
+        self._pending = pending or {}
+        self._compiled = compiled
+        self._offset = offset
+        self._load_lock = threading.Lock()
+        self._cache = {}
+        # Hosts under the same top domain share one string for it
+        self._top_domains = InternTable(_CACHE_SIZE)
+
+    @staticmethod
+    def from_rules(icann_rules, private_rules=()):
+        trie = _build_trie(icann_rules, private_rules)
+        return _SuffixTrie(trie, _get_depths(trie))
+
+    @staticmethod
+    def from_compiled_file(compiled_file: str, dat_file: str):
+        try:
+            with open(dat_file, 'rb') as file:
+                data = file.read()
+
+            with open(compiled_file, 'rb') as file:
+                compiled = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        # A truncated or corrupt compiled list is ignored like a missing one,
+        # so the text list is read instead
+        try:
+            magic, header_length = _COMPILED_PREFIX.unpack_from(compiled)
+            offset = _COMPILED_PREFIX.size + header_length
+
+            if magic != _COMPILED_MAGIC or offset > len(compiled):
+                return None
+
+            size, checksum, depths, pending = marshal.loads(compiled[_COMPILED_PREFIX.size:offset])
+
+            if any(offset + start + length > len(compiled) for start, length in pending.values()):
+                return None
+        except (struct.error, EOFError, ValueError, TypeError, AttributeError):
+            return None
+
+        # The .dat file is the source of truth, so a compiled list built from
+        # another version of it is ignored
+        if size != len(data) or checksum != zlib.crc32(data):
+            return None
+
+        return _SuffixTrie({}, depths, pending, compiled, offset)
+
+    def _load(self, label: str):
+        with self._load_lock:
+            position = self._pending.get(label)
+
+            if position is None:
+                return
+
+            # The subtree is in the trie before the label leaves the pending
+            # labels, so a thread that does not find the label pending never
+            # looks it up in a trie without it
+            start = self._offset + position[0]
+            self.trie[label] = marshal.loads(self._compiled[start:start + position[1]])
+            del self._pending[label]
+
+    def get_trie(self) -> dict:
+        for label in list(self._pending):
+            self._load(label)
+
+        return self.trie
+
+    def _get_key(self, domain_parts):
+        # No rule looks further left than the longest rule under the host's
+        # top level label, so every host sharing that many last labels shares
+        # the same top domains. Under most top level labels that is the
+        # registrable domain or less.
+        return tuple(domain_parts[-self._depths.get(domain_parts[-1], self._default_depth):])
+
+    def find_top_domain(self, domain_parts: list, include_private: bool = True, stats=None) -> str:
+        # Racing threads can only ever store the same top domains for a key,
+        # so the cache is shared without a lock
+        key = self._get_key(domain_parts)
+        cache = self._cache
+        top_domains = cache.get(key)
+
+        if top_domains is not None:
+            if stats is not None:
+                stats.record_lookup(top_domains[include_private], True)
+
+            return top_domains[include_private]
+
+        if domain_parts[-1] in self._pending:
+            self._load(domain_parts[-1])
+
+        intern = self._top_domains.intern
+        icann_top_domain, top_domain = _match_top_domains(self.trie, domain_parts)
+        top_domains = intern(icann_top_domain), intern(top_domain)
+
+        if len(cache) >= _CACHE_SIZE:
+            cache.clear()
+
+        cache[key] = top_domains
+
+        if stats is not None:
+            stats.record_lookup(top_domains[include_private], False)
+
+        return top_domains[include_private]
 
 
 class PublicSuffixList:
-    _public_suffix_list = None
+    # The ICANN rules and all rules, private ones last
+    _public_suffix_lists = None
+    _suffix_trie = None
+    # The ICANN and private rules swapped in with load, None for the bundled
+    # list, so worker processes can be handed the same list
+    _loaded_rules = None
+    _include_private = True
+    _version = 0
+    # Held to build the list or trie the first time and to swap in a new one.
+    # Once built they are never changed, so lookups never take it.
+    _load_lock = threading.RLock()
+
+    @staticmethod
+    def _get_lists() -> tuple:
+        public_suffix_lists = PublicSuffixList._public_suffix_lists
+
+        if public_suffix_lists is not None:
+            return public_suffix_lists
+
+        with PublicSuffixList._load_lock:
+            if PublicSuffixList._public_suffix_lists is None:
+                with open(DAT_FILE, encoding='utf-8') as file:
+                    icann_rules, private_rules = _read_sections(file.read())
+
+                PublicSuffixList._public_suffix_lists = (icann_rules, icann_rules + private_rules)
+
+            return PublicSuffixList._public_suffix_lists
+
+    @staticmethod
+    def get_list(include_private: bool = True) -> tuple:
+        return PublicSuffixList._get_lists()[include_private]
+
+    @staticmethod
+    def _get_suffix_trie() -> _SuffixTrie:
+        suffix_trie = PublicSuffixList._suffix_trie
+
+        if suffix_trie is not None:
+            return suffix_trie
+
+        with PublicSuffixList._load_lock:
+            if PublicSuffixList._suffix_trie is None:
+                suffix_trie = _SuffixTrie.from_compiled_file(COMPILED_FILE, DAT_FILE)
+
+                if suffix_trie is None:
+                    icann_rules, all_rules = PublicSuffixList._get_lists()
+                    suffix_trie = _SuffixTrie.from_rules(icann_rules, all_rules[len(icann_rules):])
+
+                PublicSuffixList._suffix_trie = suffix_trie
+
+            return PublicSuffixList._suffix_trie
 
     @staticmethod
-    def get_list():
-        if PublicSuffixList._public_suffix_list is not None:
-            return PublicSuffixList._public_suffix_list
+    def get_trie() -> dict:
+        return PublicSuffixList._get_suffix_trie().get_trie()
 
-        public_suffix_list = []
+    @staticmethod
+    def find_top_domain(domain_parts: list, include_private: bool = None, stats=None) -> str:
+        if include_private is None:
+            include_private = PublicSuffixList._include_private
 
-        dir_path = os.path.dirname(os.path.realpath(__file__))
-        dat_file = f'{dir_path}/public_suffix_list.dat'
+        return PublicSuffixList._get_suffix_trie().find_top_domain(domain_parts, include_private, stats)
 
-        with open(dat_file, encoding='utf-8') as file:
-            data = file.readlines()
+    @staticmethod
+    def get_include_private() -> bool:
+        return PublicSuffixList._include_private
 
-            for line in data:
-                if line[0:2] == '//':
-                    continue
+    @staticmethod
+    def set_include_private(include_private: bool):
+        # Bumping the version drops host splits cached with the other setting
+        with PublicSuffixList._load_lock:
+            if include_private != PublicSuffixList._include_private:
+                PublicSuffixList._include_private = bool(include_private)
+                PublicSuffixList._version += 1
+
+    @staticmethod
+    def get_version() -> int:
+        return PublicSuffixList._version
 
-                line = line.replace('\n', '')
-                line = line.replace('\r', '')
+    @staticmethod
+    def load(source=None):
+        if isinstance(source, bytes):
+            text = source.decode('utf-8')
+        else:
+            with open(DAT_FILE if source is None else source, encoding='utf-8') as file:
+                text = file.read()
+
+        icann_rules, private_rules = _read_sections(text)
 
-                if line == '':
-                    continue
+        if not icann_rules and not private_rules:
+            raise ValueError('The public suffix list has no rules')
 
-                public_suffix_list.append(line)
+        PublicSuffixList._load_rules(icann_rules, private_rules, source is None)
 
-        PublicSuffixList._public_suffix_list = public_suffix_list
+    @staticmethod
+    def _load_rules(icann_rules, private_rules, bundled=False):
+        suffix_trie = _SuffixTrie.from_rules(icann_rules, private_rules)
 
-        return PublicSuffixList._public_suffix_list
+        # Readers only ever read these attributes once per lookup, so the new
+        # list is swapped in whole without locking them out. The version is
+        # bumped last, so a reader that sees it also sees the new list.
+        with PublicSuffixList._load_lock:
+            PublicSuffixList._public_suffix_lists = (icann_rules, icann_rules + private_rules)
+            PublicSuffixList._suffix_trie = suffix_trie
+            PublicSuffixList._loaded_rules = None if bundled else (icann_rules, private_rules)
+            PublicSuffixList._version += 1
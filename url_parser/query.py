@@ -0,0 +1,166 @@
+import re
+from collections.abc import Mapping
+from urllib.parse import unquote_plus
+
+_MISSING = object()
+
+# Find a "%" or "+" in the first key or in a key after an "&"
+_ESCAPED_FIRST_KEY = re.compile(r'[^=&%+]*[%+]')
+_ESCAPED_KEY = re.compile(r'&[^=&%+]*[%+]')
+
+
+def _decode(value: str) -> str:
+    if '%' in value or '+' in value:
+        return unquote_plus(value)
+
+    return value
+
+
+class QueryView(Mapping):
+    # A read only view of a query string inside a url. It only records where
+    # each parameter starts and ends, and percent-decodes keys and values when
+    # they are read. Like the query dict of get_url, a repeated key maps to
+    # its last value, and a key without "=" maps to None. get_all returns
+    # every value of a key.
+    __slots__ = ('_string', '_start', '_end', '_index')
+
+    def __init__(self, string: str, start: int = 0, end: int = None):
+        self._string = string
+        self._start = start
+        self._end = len(string) if end is None else end
+        self._index = None
+
+    @property
+    def raw(self) -> str:
+        return self._string[self._start:self._end]
+
+    def _parameters(self):
+        position = self._start
+
+        for parameter in self._string[self._start:self._end].split('&'):
+            end = position + len(parameter)
+
+            if parameter:
+                equals = parameter.find('=')
+
+                if equals == -1:
+                    yield position, end, -1, -1
+                else:
+                    yield position, position + equals, position + equals + 1, end
+
+            position = end + 1
+
+    def _key(self, key_start, key_end):
+        return _decode(self._string[key_start:key_end])
+
+    def _value(self, value_start, value_end):
+        if value_start < 0:
+            return None
+
+        return _decode(self._string[value_start:value_end])
+
+    def _get_index(self) -> dict:
+        if self._index is None:
+            index = {}
+
+            for key_start, key_end, value_start, value_end in self._parameters():
+                index.setdefault(self._key(key_start, key_end), []).append((value_start, value_end))
+
+            self._index = index
+
+        return self._index
+
+    def _has_escaped_key(self) -> bool:
+        string = self._string
+        start = self._start
+        end = self._end
+
+        if string.find('%', start, end) == -1 and string.find('+', start, end) == -1:
+            return False
+
+        return bool(_ESCAPED_FIRST_KEY.match(string, start, end) or _ESCAPED_KEY.search(string, start, end))
+
+    def _find(self, key) -> list:
+        if self._index is not None:
+            return self._index.get(key, [])
+
+        # Keys are always strings, like the keys of the index
+        if not isinstance(key, str):
+            return []
+
+        string = self._string
+        start = self._start
+        end = self._end
+
+        # Only a decoded key can hold "&" or "=", and finding it spelled as
+        # given would match across parameters
+        if not key or '&' in key or '=' in key or self._has_escaped_key():
+            positions = []
+            position = start
+
+            for parameter in string[start:end].split('&'):
+                name, equals, _ = parameter.partition('=')
+
+                # Only the decoded key counts, like in the index
+                if parameter and _decode(name) == key:
+                    value_start = position + len(name) + 1 if equals else -1
+                    positions.append((value_start, position + len(parameter) if equals else -1))
+
+                position += len(parameter) + 1
+
+            return positions
+
+        # No key is escaped, so the key can only be spelled as it is given,
+        # and its occurrences are found without walking every parameter
+        positions = []
+        position = string.find(key, start, end)
+
+        while position != -1:
+            key_end = position + len(key)
+
+            if position == start or string[position - 1] == '&':
+                if key_end == end or string[key_end] == '&':
+                    positions.append((-1, -1))
+                elif string[key_end] == '=':
+                    value_end = string.find('&', key_end, end)
+                    positions.append((key_end + 1, end if value_end == -1 else value_end))
+
+            position = string.find(key, position + 1, end)
+
+        return positions
+
+    def get(self, key, default=None):
+        positions = self._find(key)
+        return self._value(*positions[-1]) if positions else default
+
+    def get_all(self, key) -> list:
+        return [self._value(*position) for position in self._find(key)]
+
+    def all_items(self) -> list:
+        return [
+            (self._key(key_start, key_end), self._value(value_start, value_end))
+            for key_start, key_end, value_start, value_end in self._parameters()
+        ]
+
+    def to_dict(self) -> dict:
+        return dict(self.all_items())
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+
+        if value is _MISSING:
+            raise KeyError(key)
+
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self):
+        return iter(self._get_index())
+
+    def __len__(self):
+        return len(self._get_index())
+
+    def __repr__(self):
+        return f'QueryView({self.raw!r})'
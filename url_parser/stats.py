@@ -0,0 +1,94 @@
+import heapq
+import threading
+from collections import Counter, namedtuple
+
+STAGES = ('regex', 'host', 'path', 'query')
+REGEX_STAGE, HOST_STAGE, PATH_STAGE, QUERY_STAGE = range(len(STAGES))
+
+Stats = namedtuple('Stats', [
+    'calls',
+    'errors',
+    'stage_seconds',
+    'top_domain_depths',
+    'top_domain_cache_hits',
+    'top_domain_cache_misses',
+    'slow_urls',
+])
+
+
+class StatsCollector:
+    # Stages are reported by the helpers every parser shares, so a url is
+    # started by its regex match and the stages after it on the same thread
+    # add to its time. It counts towards the slowest urls once the thread
+    # starts its next url, or when a snapshot is taken.
+    def __init__(self, slow_urls: int = 10):
+        if slow_urls < 0:
+            raise ValueError('slow_urls must not be negative')
+
+        self.slow_urls = slow_urls
+        self._lock = threading.Lock()
+        self.clear()
+
+    def _push_slow(self, total_ns, url):
+        # A min heap of the slowest urls, so the fastest of them is the one
+        # pushed out
+        if len(self._slow) < self.slow_urls:
+            heapq.heappush(self._slow, (total_ns, url))
+        elif self.slow_urls and total_ns > self._slow[0][0]:
+            heapq.heapreplace(self._slow, (total_ns, url))
+
+    def start_url(self, url: str, regex_ns: int):
+        thread = threading.get_ident()
+
+        with self._lock:
+            current = self._current.get(thread)
+
+            if current is not None:
+                self._push_slow(*current)
+
+            self._current[thread] = [regex_ns, url]
+            self._calls += 1
+            self._stage_ns[REGEX_STAGE] += regex_ns
+
+    def record_stage(self, stage: int, elapsed_ns: int):
+        with self._lock:
+            self._stage_ns[stage] += elapsed_ns
+            current = self._current.get(threading.get_ident())
+
+            if current is not None:
+                current[0] += elapsed_ns
+
+    def record_lookup(self, top_domain: str, cached: bool):
+        with self._lock:
+            self._depths[top_domain.count('.') + 1] += 1
+            self._cache_lookups[cached] += 1
+
+    def record_error(self):
+        with self._lock:
+            self._errors += 1
+
+    def snapshot(self) -> Stats:
+        with self._lock:
+            slow = heapq.nlargest(
+                self.slow_urls, self._slow + [tuple(current) for current in self._current.values()],
+            )
+
+            return Stats(
+                self._calls,
+                self._errors,
+                {stage: elapsed / 1e9 for stage, elapsed in zip(STAGES, self._stage_ns)},
+                dict(sorted(self._depths.items())),
+                self._cache_lookups[True],
+                self._cache_lookups[False],
+                [(url, elapsed / 1e9) for elapsed, url in slow],
+            )
+
+    def clear(self):
+        with self._lock:
+            self._calls = 0
+            self._errors = 0
+            self._stage_ns = [0] * len(STAGES)
+            self._depths = Counter()
+            self._cache_lookups = Counter()
+            self._slow = []
+            self._current = {}